@@ -3,17 +3,35 @@
 iFlow 账号管理工具 - 交互式终端版
 """
 
+import getpass
 import io
 import json
 import os
 import platform
 import re
+import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
+from http.cookiejar import DefaultCookiePolicy
 from pathlib import Path
 from colorama import init, Fore, Style
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:
+    print("缺少依赖 requests，请先执行: pip install -r requirements.txt")
+    sys.exit(1)
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时回退到标准库 json
+    orjson = None
+
 # 修复 Windows 控制台编码问题
 if sys.platform == "win32":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -21,6 +39,13 @@ if sys.platform == "win32":
 
 init(autoreset=True)
 
+# 运行期间不会变化的系统信息，启动时获取一次
+SYSTEM = platform.system()  # 'Windows', 'Darwin', 'Linux'
+# 优先读环境变量，os.getlogin() 在部分终端/无控制终端环境下会失败，最后回退到 getpass
+USERNAME = os.environ.get("USERNAME") or os.environ.get("USER") or getpass.getuser()
+# ccr 可执行文件的完整路径（Windows 下为 ccr.cmd），直接调用无需经过 shell
+CCR_BIN = shutil.which("ccr")
+
 # API 配置
 API_URL = "https://platform.iflow.cn/api/openapi/apikey"
 PROFILE_URL = "https://platform.iflow.cn/profile"
@@ -35,23 +60,90 @@ PROFILE_HEADERS = {
 }
 CONFIG_FILE = "accounts.json"
 
+# CCR 配置模板
+CCR_TEMPLATE_BASE = "https://raw.githubusercontent.com/715494637/iflow-manager/refs/heads/master/ccr%20config"
+HEADER_JS_URL = f"{CCR_TEMPLATE_BASE}/plugins/header.js"
+CONFIG_JSON_URL = f"{CCR_TEMPLATE_BASE}/config.json"
+
+# 从 profile 页面提取账号名（按优先级）
+MASKED_PHONE_RE = re.compile(r'(\d{3}\*{4}\d{4})')
+JSON_PHONE_RE = re.compile(r'"phone"\s*:\s*"([^"]+)"')
+JSON_NAME_RE = re.compile(r'"name"\s*:\s*"([^"]+)"')
+
+# 中文字符（显示宽度为2）
+WIDE_CHAR_RE = re.compile('[\u4e00-\u9fff]')
+
+# 连接池配置
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+MAX_WORKERS = 8
+
 # 颜色定义
 C = Fore
 R = Style.RESET_ALL
 B = Style.BRIGHT
 
+# 调试输出开关（设置环境变量 IFLOW_DEBUG=1 开启）
+DEBUG = os.environ.get("IFLOW_DEBUG", "") not in ("", "0")
+
+# 账号表格列宽（显示宽度，中文字符占2个宽度）：序号 / 账号 / API Key / 过期时间 / 剩余
+TABLE_WIDTHS = (4, 13, 26, 16, 8)
+# 边框宽度 = 显示宽度 + 2（左右各一个空格）
+TABLE_BORDER = "+" + "+".join("-" * (w + 2) for w in TABLE_WIDTHS) + "+"
+TABLE_ROW_FMT = f"| {B}{{c1}}{R} | {B}{C.GREEN}{{c2}}{R} | {B}{C.BLUE}{{c3}}{R} | {C.MAGENTA}{{c4}}{R} | {{color}}{{c5}}{R} |"
+STATUS_COLORS = {"expired": C.RED, "expiring": C.YELLOW, "normal": C.GREEN}
+
+
+def debug(msg, log=None):
+    """输出调试信息（仅在开启 IFLOW_DEBUG 时），传入 log 时追加到列表而不直接打印"""
+    if DEBUG:
+        line = f"{C.WHITE}[DEBUG] {msg}{R}"
+        if log is None:
+            print(line)
+        else:
+            log.append(line)
+
+
+def create_session():
+    """创建共享的 requests.Session（复用 TCP/TLS 连接）"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # 不保存服务端下发的 Cookie，避免多账号之间串号（BXAuth 每次请求单独传入）
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+SESSION = create_session()
+
 
+def dump_json(data):
+    """序列化为带 2 空格缩进的 UTF-8 JSON（bytes）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def load_json(raw):
+    """解析 JSON（bytes 或 str）"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+@lru_cache(maxsize=4096)
 def get_display_width(s):
     """计算字符串的实际显示宽度（中文占2个字符宽度）"""
-    width = 0
-    for char in s:
-        if '\u4e00' <= char <= '\u9fff':
-            width += 2
-        else:
-            width += 1
-    return width
+    # 每个中文字符在长度之外再多占1格，由正则在 C 层统计
+    return len(s) + len(WIDE_CHAR_RE.findall(s))
 
 
+@lru_cache(maxsize=4096)
 def pad_string(s, width):
     """按显示宽度填充字符串，左对齐"""
     current_width = get_display_width(s)
@@ -112,8 +204,7 @@ def get_ccr_plugins_path():
 def get_ccr_status():
     """获取 CCR 文件状态"""
     paths = get_cross_platform_paths()
-    system = platform.system()
-    system_name = {"Windows": "Windows", "Darwin": "macOS", "Linux": "Linux"}.get(system, system)
+    system_name = {"Windows": "Windows", "Darwin": "macOS", "Linux": "Linux"}.get(SYSTEM, SYSTEM)
 
     config_path = Path(paths["config_json"])
     header_path = Path(paths["header_js"])
@@ -128,20 +219,33 @@ def get_ccr_status():
     }
 
 
+# accounts.json 内存缓存，按 mtime 失效
+# 调用方会原地修改返回的数据再保存；保存失败时缓存已清空，下次会重新读取磁盘内容
+_accounts_cache = {"mtime": None, "data": None}
+
+
 def load_accounts():
     config_path = get_config_path()
-    if not config_path.exists():
+    try:
+        mtime = config_path.stat().st_mtime_ns
+    except FileNotFoundError:
         return {"accounts": []}
-    with open(config_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    if _accounts_cache["data"] is not None and _accounts_cache["mtime"] == mtime:
+        return _accounts_cache["data"]
+    data = load_json(config_path.read_bytes())
+    _accounts_cache.update(mtime=mtime, data=data)
+    return data
 
 
 def save_accounts(data):
     config_path = get_config_path()
-    with open(config_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # 先让缓存失效，写入成功后再回填，避免写入失败时缓存保留未落盘的修改
+    _accounts_cache["data"] = None
+    config_path.write_bytes(dump_json(data))
+    _accounts_cache.update(mtime=config_path.stat().st_mtime_ns, data=data)
 
 
+@lru_cache(maxsize=1024)
 def parse_expire_time(expire_str):
     try:
         return datetime.strptime(expire_str, "%Y-%m-%d %H:%M")
@@ -149,12 +253,13 @@ def parse_expire_time(expire_str):
         return None
 
 
-def get_time_remaining(expire_str):
+def get_time_remaining(expire_str, now=None):
     expire_dt = parse_expire_time(expire_str)
     if not expire_dt:
         return "未知", "unknown"
 
-    now = datetime.now()
+    if now is None:
+        now = datetime.now()
     diff = expire_dt - now
 
     if diff.total_seconds() <= 0:
@@ -177,18 +282,17 @@ def get_time_remaining(expire_str):
 
 def fetch_profile_name(bxauth):
     """从 profile 页面获取账号名称"""
-    import requests
     cookies = {"BXAuth": bxauth}
 
     try:
-        response = requests.get(
+        response = SESSION.get(
             PROFILE_URL,
             headers=PROFILE_HEADERS,
             cookies=cookies,
             params={"tab": "apiKey"},
             timeout=30
         )
-        print(f"{C.WHITE}[DEBUG] Profile 响应状态: {response.status_code}{R}")
+        debug(f"Profile 响应状态: {response.status_code}")
 
         if response.status_code == 200:
             # 从 HTML 中提取手机号/账号名
@@ -196,22 +300,22 @@ def fetch_profile_name(bxauth):
             html = response.text
 
             # 尝试从页面提取手机号 (格式如 136****8852)
-            match = re.search(r'(\d{3}\*{4}\d{4})', html)
+            match = MASKED_PHONE_RE.search(html)
             if match:
                 name = match.group(1)
-                print(f"{C.WHITE}[DEBUG] 从页面提取的账号名: {name}{R}")
+                debug(f"从页面提取的账号名: {name}")
                 return name
 
             # 尝试其他模式
-            match = re.search(r'"phone"\s*:\s*"([^"]+)"', html)
+            match = JSON_PHONE_RE.search(html)
             if match:
                 return match.group(1)
 
-            match = re.search(r'"name"\s*:\s*"([^"]+)"', html)
+            match = JSON_NAME_RE.search(html)
             if match:
                 return match.group(1)
 
-            print(f"{C.WHITE}[DEBUG] 未找到账号名，使用默认值{R}")
+            debug("未找到账号名，使用默认值")
             return "未知"
         print(f"{C.RED}获取 Profile 失败: {response.status_code}{R}")
     except Exception as e:
@@ -219,16 +323,17 @@ def fetch_profile_name(bxauth):
     return "未知"
 
 
-def fetch_api_key_info(bxauth):
+def fetch_api_key_info(bxauth, log=None):
     """获取 apiKey 和 expireTime（不获取 name）"""
-    import requests
+    # 传入 log 时输出追加到列表而不直接打印，供并发调用方按账号汇总
+    emit = print if log is None else log.append
     cookies = {"BXAuth": bxauth}
     data = json.dumps({"name": ""}, separators=(',', ':'))
 
     try:
-        response = requests.post(API_URL, headers=HEADERS, cookies=cookies, data=data, timeout=30)
-        print(f"{C.WHITE}[DEBUG] API Key 响应状态: {response.status_code}{R}")
-        print(f"{C.WHITE}[DEBUG] API Key 响应内容: {response.text[:200]}{R}")
+        response = SESSION.post(API_URL, headers=HEADERS, cookies=cookies, data=data, timeout=30)
+        debug(f"API Key 响应状态: {response.status_code}", log)
+        debug(f"API Key 响应内容: {response.text[:200]}", log)
 
         if response.status_code == 200:
             result = response.json()
@@ -239,43 +344,48 @@ def fetch_api_key_info(bxauth):
                     "expireTime": data.get("expireTime", ""),
                 }
                 return info
-        print(f"{C.RED}请求失败: {response.status_code}{R}")
+        emit(f"{C.RED}请求失败: {response.status_code}{R}")
     except Exception as e:
-        print(f"{C.RED}网络错误: {e}{R}")
+        emit(f"{C.RED}网络错误: {e}{R}")
     return None
 
 
+def index_providers(ccr_config):
+    """建立 provider 名称到 Providers 列表下标的索引"""
+    index = {}
+    for i, provider in enumerate(ccr_config.get("Providers", [])):
+        # 同名 provider 以第一个为准，与原先的线性查找一致
+        index.setdefault(provider.get("name"), i)
+    return index
+
+
 def update_ccr_config_and_restart():
     """更新 CCR 配置并执行 restart"""
-    import requests
-
     ccr_path = get_ccr_config_path()
-    print(f"{C.WHITE}[DEBUG] CCR 配置路径: {ccr_path}{R}")
+    debug(f"CCR 配置路径: {ccr_path}")
 
     if not ccr_path.exists():
         print(f"{C.YELLOW}⚠️ CCR 配置不存在: {ccr_path}{R}")
         return False
 
     try:
-        with open(ccr_path, "r", encoding="utf-8") as f:
-            ccr_config = json.load(f)
+        ccr_config = load_json(ccr_path.read_bytes())
     except Exception as e:
         print(f"{C.RED}读取 CCR 配置失败: {e}{R}")
         return False
 
     accounts_data = load_accounts()
-    api_keys = ",".join([acc.get("apiKey", "") for acc in accounts_data.get("accounts", []) if acc.get("apiKey")])
+    api_keys = ",".join(filter(None, (acc.get("apiKey") for acc in accounts_data.get("accounts", ()))))
 
     if not api_keys:
         print(f"{C.YELLOW}没有有效账号{R}")
         return False
 
-    print(f"{C.WHITE}[DEBUG] API Keys 数量: {len(api_keys.split(','))}{R}")
+    debug(f"API Keys 数量: {len(api_keys.split(','))}")
 
-    for provider in ccr_config.get("Providers", []):
-        if provider.get("name") == "op-provider":
-            provider["api_key"] = api_keys
-            break
+    idx = index_providers(ccr_config).get("op-provider")
+    if idx is not None:
+        ccr_config["Providers"][idx]["api_key"] = api_keys
     else:
         ccr_config.setdefault("Providers", []).append({
             "name": "op-provider",
@@ -286,8 +396,7 @@ def update_ccr_config_and_restart():
         })
 
     try:
-        with open(ccr_path, "w", encoding="utf-8") as f:
-            json.dump(ccr_config, f, ensure_ascii=False, indent=2)
+        ccr_path.write_bytes(dump_json(ccr_config))
         print(f"{C.GREEN}✅ CCR 配置已更新{R}")
     except Exception as e:
         print(f"{C.RED}保存 CCR 配置失败: {e}{R}")
@@ -295,13 +404,15 @@ def update_ccr_config_and_restart():
 
     # 执行 ccr restart
     print(f"\n{C.CYAN}🔄 正在执行 ccr restart...{R}")
+    if CCR_BIN is None:
+        print(f"{C.YELLOW}⚠️ 未找到 ccr 命令，请确保已安装并配置在 PATH 中{R}")
+        return False
     try:
         result = subprocess.run(
-            "ccr restart",
+            [CCR_BIN, "restart"],
             capture_output=True,
             text=True,
             timeout=60,
-            shell=True,
             encoding="utf-8",
             errors="ignore"
         )
@@ -321,42 +432,53 @@ def update_ccr_config_and_restart():
     except subprocess.TimeoutExpired:
         print(f"{C.RED}❌ CCR 重启超时{R}")
         return False
-    except FileNotFoundError:
-        print(f"{C.YELLOW}⚠️ 未找到 ccr 命令，请确保已安装并配置在 PATH 中{R}")
-        return False
     except Exception as e:
         print(f"{C.RED}❌ 执行失败: {e}{R}")
         return False
 
 
+@lru_cache(maxsize=1)
 def get_cross_platform_paths():
     """获取跨平台的 CCR 路径"""
-    system = platform.system()  # 'Windows', 'Darwin', 'Linux'
-    username = os.getlogin()
-
-    if system == 'Windows':
-        base_path = f"C:/Users/{username}/.claude-code-router"
-    elif system == 'Darwin':  # Mac
-        base_path = f"/Users/{username}/.claude-code-router"
+    if SYSTEM == 'Windows':
+        base_path = f"C:/Users/{USERNAME}/.claude-code-router"
+    elif SYSTEM == 'Darwin':  # Mac
+        base_path = f"/Users/{USERNAME}/.claude-code-router"
     else:  # Linux
-        base_path = f"/home/{username}/.claude-code-router"
+        base_path = f"/home/{USERNAME}/.claude-code-router"
 
     return {
         "base": base_path,
         "plugins": f"{base_path}/plugins",
         "header_js": f"{base_path}/plugins/header.js",
         "config_json": f"{base_path}/config.json",
+        # 条件请求用的 ETag 记录和未修改的 config.json 模板缓存
+        "etags": f"{base_path}/.etags.json",
+        "config_template": f"{base_path}/.config.template.json",
     }
 
 
+def download_cached(url, cache_path, etag=None):
+    """按 ETag 条件下载文件到 cache_path，返回 (状态码, 内容, ETag)，304 时读取本地缓存"""
+    headers = {}
+    # 本地文件不存在时不能依赖 304，必须完整下载
+    if etag and cache_path.exists():
+        headers["If-None-Match"] = etag
+    response = SESSION.get(url, headers=headers, timeout=30)
+    if response.status_code == 304:
+        return 304, cache_path.read_bytes(), etag
+    if response.status_code == 200:
+        cache_path.write_bytes(response.content)
+        return 200, response.content, response.headers.get("ETag")
+    return response.status_code, None, None
+
+
 def init_ccr_config():
     """初始化 CCR 配置"""
-    import requests
-
     paths = get_cross_platform_paths()
-    print(f"{C.WHITE}[DEBUG] 系统: {platform.system()}{R}")
-    print(f"{C.WHITE}[DEBUG] 用户名: {os.getlogin()}{R}")
-    print(f"{C.WHITE}[DEBUG] CCR 基础路径: {paths['base']}{R}")
+    debug(f"系统: {SYSTEM}")
+    debug(f"用户名: {USERNAME}")
+    debug(f"CCR 基础路径: {paths['base']}")
 
     # 1. 创建 plugins 目录
     plugins_dir = Path(paths["plugins"])
@@ -364,42 +486,49 @@ def init_ccr_config():
         print(f"{C.CYAN}创建 plugins 目录...{R}")
         plugins_dir.mkdir(parents=True, exist_ok=True)
 
-    # 2. 从 GitHub 获取 header.js
-    header_js_url = "https://raw.githubusercontent.com/715494637/iflow-manager/refs/heads/master/ccr%20config/plugins/header.js"
-    print(f"{C.CYAN}下载 header.js...{R}")
+    # 2. 从 GitHub 并发获取 header.js 和 config.json 模板（带 ETag 条件请求）
+    etags_path = Path(paths["etags"])
     try:
-        response = requests.get(header_js_url, timeout=30)
-        if response.status_code == 200:
-            header_js_path = Path(paths["header_js"])
-            with open(header_js_path, "w", encoding="utf-8") as f:
-                f.write(response.text)
+        etags = load_json(etags_path.read_bytes())
+    except (OSError, ValueError):
+        etags = {}
+
+    print(f"{C.CYAN}下载 header.js 和 config.json 模板...{R}")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        header_future = executor.submit(
+            download_cached, HEADER_JS_URL, Path(paths["header_js"]), etags.get("header_js"))
+        config_future = executor.submit(
+            download_cached, CONFIG_JSON_URL, Path(paths["config_template"]), etags.get("config_json"))
+
+    try:
+        status, _, etags["header_js"] = header_future.result()
+        if status == 200:
             print(f"{C.GREEN}✅ header.js 已保存{R}")
+        elif status == 304:
+            print(f"{C.GREEN}✅ header.js 未变化，沿用本地文件{R}")
         else:
-            print(f"{C.RED}❌ 下载 header.js 失败: {response.status_code}{R}")
+            print(f"{C.RED}❌ 下载 header.js 失败: {status}{R}")
             return False
     except Exception as e:
         print(f"{C.RED}❌ 下载 header.js 错误: {e}{R}")
         return False
 
-    # 3. 从 GitHub 获取 config.json 模板
-    config_json_url = "https://raw.githubusercontent.com/715494637/iflow-manager/refs/heads/master/ccr%20config/config.json"
-    print(f"{C.CYAN}下载 config.json 模板...{R}")
+    # 3. 处理 config.json 模板
     try:
-        response = requests.get(config_json_url, timeout=30)
-        if response.status_code == 200:
-            config_template = response.json()
+        status, content, etags["config_json"] = config_future.result()
+        if status in (200, 304):
+            config_template = load_json(content)
 
             # 4. 修改 path 中的用户路径
-            username = os.getlogin()
             for transformer in config_template.get("transformers", []):
                 if "path" in transformer:
-                    transformer["path"] = transformer["path"].replace("dypbi", username)
+                    transformer["path"] = transformer["path"].replace("dypbi", USERNAME)
 
             # 5. 如有账号则添加 api_key，否则设为占位符
             accounts_data = load_accounts()
             accounts = accounts_data.get("accounts", [])
 
-            api_keys = ",".join([acc.get("apiKey", "") for acc in accounts if acc.get("apiKey")])
+            api_keys = ",".join(filter(None, (acc.get("apiKey") for acc in accounts)))
             if not api_keys:
                 api_keys = "YOUR_API_KEY_HERE"
                 print(f"{C.YELLOW}⚠️ 没有账号，api_key 设为占位符{R}")
@@ -407,20 +536,19 @@ def init_ccr_config():
                 print(f"{C.GREEN}✅ 找到 {len(accounts)} 个账号{R}")
 
             # 更新 provider 配置
-            for provider in config_template.get("Providers", []):
-                if provider.get("name") == "op-provider":
-                    provider["api_key"] = api_keys
-                    break
+            idx = index_providers(config_template).get("op-provider")
+            if idx is not None:
+                config_template["Providers"][idx]["api_key"] = api_keys
 
             # 6. 写入配置文件
             config_path = Path(paths["config_json"])
-            with open(config_path, "w", encoding="utf-8") as f:
-                json.dump(config_template, f, ensure_ascii=False, indent=2)
+            config_path.write_bytes(dump_json(config_template))
+            etags_path.write_bytes(dump_json(etags))
 
             print(f"{C.GREEN}✅ CCR 配置已初始化: {config_path}{R}")
             return True
         else:
-            print(f"{C.RED}❌ 下载 config.json 失败: {response.status_code}{R}")
+            print(f"{C.RED}❌ 下载 config.json 失败: {status}{R}")
             return False
     except Exception as e:
         print(f"{C.RED}❌ 初始化 CCR 配置错误: {e}{R}")
@@ -432,12 +560,7 @@ def show_accounts(accounts):
         print(f"{C.YELLOW}暂无账号{R}")
         return 0, 0
 
-    # 显示宽度定义（中文字符占2个宽度）
-    w1 = 4   # 序号
-    w2 = 13  # 账号（11字符手机号）
-    w3 = 26  # API Key
-    w4 = 16  # 过期时间
-    w5 = 8   # 剩余
+    w1, w2, w3, w4, w5 = TABLE_WIDTHS
 
     # 表头使用 pad_string 处理中文宽度
     h1 = pad_string("序号", w1)
@@ -446,16 +569,11 @@ def show_accounts(accounts):
     h4 = pad_string("过期时间", w4)
     h5 = pad_string("剩余", w5)
 
-    # 边框宽度 = 显示宽度 + 2（左右各一个空格）
-    top_border = f"+{'-' * (w1 + 2)}+{'-' * (w2 + 2)}+{'-' * (w3 + 2)}+{'-' * (w4 + 2)}+{'-' * (w5 + 2)}+"
-    mid_border = f"+{'-' * (w1 + 2)}+{'-' * (w2 + 2)}+{'-' * (w3 + 2)}+{'-' * (w4 + 2)}+{'-' * (w5 + 2)}+"
-    bot_border = f"+{'-' * (w1 + 2)}+{'-' * (w2 + 2)}+{'-' * (w3 + 2)}+{'-' * (w4 + 2)}+{'-' * (w5 + 2)}+"
-
-    print(f"\n{B}{C.CYAN}{top_border}{R}")
-    print(f"{B}{C.CYAN}| {h1} | {h2} | {h3} | {h4} | {h5} |{R}")
-    print(f"{B}{C.CYAN}{mid_border}{R}")
+    border = f"{B}{C.CYAN}{TABLE_BORDER}{R}"
 
     expired = expiring = 0
+    now = datetime.now()
+    lines = ["", border, f"{B}{C.CYAN}| {h1} | {h2} | {h3} | {h4} | {h5} |{R}", border]
 
     for i, acc in enumerate(accounts, 1):
         name = acc.get("name", "") or "未知"
@@ -463,8 +581,7 @@ def show_accounts(accounts):
         api_display = api_key[:20] + ".." if len(api_key) > 20 else api_key
         expire_time = acc.get("expireTime", "") or "未知"
 
-        time_rem, status = get_time_remaining(acc.get("expireTime", ""))
-        color = {"expired": C.RED, "expiring": C.YELLOW, "normal": C.GREEN}.get(status, C.WHITE)
+        time_rem, status = get_time_remaining(acc.get("expireTime", ""), now)
 
         if status == "expired":
             expired += 1
@@ -472,15 +589,19 @@ def show_accounts(accounts):
             expiring += 1
 
         # 内容行也使用 pad_string 处理中文宽度
-        c1 = pad_string(str(i), w1)
-        c2 = pad_string(name, w2)
-        c3 = pad_string(api_display, w3)
-        c4 = pad_string(expire_time, w4)
-        c5 = pad_string(time_rem, w5)
-
-        print(f"| {B}{c1}{R} | {B}{C.GREEN}{c2}{R} | {B}{C.BLUE}{c3}{R} | {C.MAGENTA}{c4}{R} | {color}{c5}{R} |")
-
-    print(f"{B}{C.CYAN}{bot_border}{R}")
+        lines.append(TABLE_ROW_FMT.format(
+            c1=pad_string(str(i), w1),
+            c2=pad_string(name, w2),
+            c3=pad_string(api_display, w3),
+            c4=pad_string(expire_time, w4),
+            c5=pad_string(time_rem, w5),
+            color=STATUS_COLORS.get(status, C.WHITE),
+        ))
+
+    # 整张表格一次性写出
+    lines.append(border)
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
     return expired, expiring
 
 
@@ -509,6 +630,41 @@ def input_yesno(prompt, default=True):
         print(f"{C.RED}请输入 y 或 n{R}")
 
 
+def refresh_accounts(accounts, indices):
+    """并发刷新指定账号的 apiKey 和 expireTime，返回成功数量"""
+    indices = list(indices)
+    if not indices:
+        return 0
+
+    print(f"  🔄 正在更新 {len(indices)} 个账号...")
+    success = 0
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(indices))) as executor:
+        # 每个任务的输出收集到各自的 log 中，不在工作线程里打印
+        logs = {idx: [] for idx in indices}
+        futures = {
+            executor.submit(fetch_api_key_info, accounts[idx].get("BXAuth", ""), logs[idx]): idx
+            for idx in indices
+        }
+        # 结果统一在主线程输出，每个账号一次写出一整行
+        for future in as_completed(futures):
+            idx = futures[future]
+            info = future.result()
+            buf = [f"  {accounts[idx].get('name', '未知')} "]
+            if info:
+                # 只更新 apiKey 和 expireTime，不更新 name
+                accounts[idx]["apiKey"] = info["apiKey"]
+                accounts[idx]["expireTime"] = info["expireTime"]
+                buf.append(f"{C.GREEN}✅{R}")
+                success += 1
+            else:
+                buf.append(f"{C.RED}❌{R}")
+            # 该账号的调试/错误信息缩进列在结果行下方
+            buf.extend(f"\n    {msg}" for msg in logs[idx])
+            sys.stdout.write("".join(buf) + "\n")
+    sys.stdout.flush()
+    return success
+
+
 def smart_update_accounts(accounts_data, accounts):
     """智能更新 - 只更新快过期的账号的 apiKey 和 expireTime"""
     if not accounts:
@@ -516,8 +672,9 @@ def smart_update_accounts(accounts_data, accounts):
         return 0
 
     to_update = []
+    now = datetime.now()
     for i, acc in enumerate(accounts):
-        time_rem, status = get_time_remaining(acc.get("expireTime", ""))
+        time_rem, status = get_time_remaining(acc.get("expireTime", ""), now)
         if status in ["expired", "expiring"]:
             to_update.append(i)
 
@@ -529,19 +686,7 @@ def smart_update_accounts(accounts_data, accounts):
     if not input_yesno("是否更新这些账号？"):
         return 0
 
-    success = 0
-    for idx in to_update:
-        name = accounts[idx].get("name", "未知")
-        print(f"  🔄 正在更新 {name}...", end=" ", flush=True)
-        info = fetch_api_key_info(accounts[idx].get("BXAuth", ""))
-        if info:
-            # 只更新 apiKey 和 expireTime，不更新 name
-            accounts[idx]["apiKey"] = info["apiKey"]
-            accounts[idx]["expireTime"] = info["expireTime"]
-            print(f"{C.GREEN}✅{R}")
-            success += 1
-        else:
-            print(f"{C.RED}❌{R}")
+    success = refresh_accounts(accounts, to_update)
 
     save_accounts(accounts_data)
     print(f"{C.GREEN}更新完成: {success}/{len(to_update)}{R}")
@@ -554,19 +699,7 @@ def force_update_all_accounts(accounts_data, accounts):
         print(f"{C.YELLOW}没有可更新的账号{R}")
         return 0
 
-    success = 0
-    for idx, acc in enumerate(accounts):
-        name = acc.get("name", "未知")
-        print(f"  🔄 正在更新 {name}...", end=" ", flush=True)
-        info = fetch_api_key_info(acc.get("BXAuth", ""))
-        if info:
-            # 只更新 apiKey 和 expireTime，不更新 name
-            accounts[idx]["apiKey"] = info["apiKey"]
-            accounts[idx]["expireTime"] = info["expireTime"]
-            print(f"{C.GREEN}✅{R}")
-            success += 1
-        else:
-            print(f"{C.RED}❌{R}")
+    success = refresh_accounts(accounts, range(len(accounts)))
 
     save_accounts(accounts_data)
     print(f"{C.GREEN}强制更新完成: {success}/{len(accounts)}{R}")